@@ -12,6 +12,7 @@ class DummyAuthBackend(AuthBackend):
 def login_required(function=None):
     def decorator(function):
         function.login_required = True
+        function._rpc_unrestricted = False
 
         return function
 
@@ -27,6 +28,7 @@ def permission_required(permission):
             function.permissions_required = set()
 
         function.permissions_required.add(permission)
+        function._rpc_unrestricted = False
 
         return function
 
@@ -42,6 +44,7 @@ def user_passes_test(test_func):
             function.tests = set()
 
         function.tests.add(test_func)
+        function._rpc_unrestricted = False
 
         return function
 
@@ -1,74 +1,368 @@
 from importlib import import_module
-
-from django.contrib.auth import authenticate, login as django_login
-from django.contrib.auth.models import User, AnonymousUser
-from django.contrib.sessions.models import Session
-from django.forms.models import model_to_dict
+import threading
+import functools
+import copy
+import time
+
+from django.contrib.auth import (
+    SESSION_KEY,
+    authenticate,
+    get_backends,
+    login as django_login,
+)
+
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.models import User, AnonymousUser, Permission
+from django.core.exceptions import FieldDoesNotExist
+from django.db import close_old_connections, connections, router
+from django.db.models import Manager
 from django.conf import settings
-from django.http import HttpRequest
+from django.http import HttpRequest, QueryDict
+from django.utils.datastructures import MultiValueDict
 from django.apps import apps
 
 from .. import RpcInvalidParamsError
 from ..rpc import JsonRpcMethod
 from . import AuthBackend
 
+try:
+    from asgiref.sync import sync_to_async
+
+except ImportError:  # Django < 3.0
+    sync_to_async = None
+
+
+@functools.lru_cache(maxsize=None)
+def _field_names(model):
+    # (name, attname) pairs of all concrete fields; foreign keys are dumped
+    # under their field name holding the raw id, like model_to_dict() does
+    return tuple(
+        (field.name, field.attname) for field in model._meta.concrete_fields
+    )
+
+
+# field types whose values need no conversion between python and the
+# database; raw SQL views are only used for models made of these, as long
+# as neither the field nor the database backend registers converters
+RAW_SQL_FIELD_TYPES = frozenset({
+    'AutoField',
+    'BigAutoField',
+    'SmallAutoField',
+    'IntegerField',
+    'BigIntegerField',
+    'SmallIntegerField',
+    'PositiveIntegerField',
+    'PositiveSmallIntegerField',
+    'FloatField',
+    'CharField',
+    'TextField',
+})
+
+
+def _needs_conversion(field, connection):
+    # subclasses, for example of TextField, report the internal type of
+    # their base class but may still convert values in from_db_value()
+    return bool(
+        field.get_internal_type() not in RAW_SQL_FIELD_TYPES or
+        field.get_db_converters(connection) or
+        connection.ops.get_db_converters(
+            field.get_col(field.model._meta.db_table))
+    )
+
+
+@functools.lru_cache(maxsize=512)
+def _get_raw_select(model, lookup_keys, using):
+    # compiles 'SELECT <columns> FROM <table> WHERE <column> = %s AND ...'
+    # once per model, set of lookup keys and database. Returns None if the
+    # model or the lookups need the ORM: non exact lookups, relations,
+    # conversions, custom managers, default ordering or inheritance
+    opts = model._meta
+    fields = opts.concrete_fields
+    connection = connections[using]
+
+    if(type(model.objects) is not Manager or
+       opts.ordering or opts.parents or
+       any(_needs_conversion(i, connection) for i in fields)):
+
+        return None
+
+    lookup_fields = {'pk': opts.pk}
+
+    for field in fields:
+        lookup_fields[field.name] = field
+        lookup_fields[field.attname] = field
+
+    if not all(i in lookup_fields for i in lookup_keys):
+        return None
+
+    quote_name = connection.ops.quote_name
+
+    columns = ', '.join(quote_name(i.column) for i in (*fields, opts.pk))
+    sql = f'SELECT {columns} FROM {quote_name(opts.db_table)}'
+
+    if lookup_keys:
+        sql += ' WHERE ' + ' AND '.join(
+            f'{quote_name(lookup_fields[i].column)} = %s'
+            for i in lookup_keys
+        )
+
+    names = (*(i.name for i in fields), 'pk')
+
+    return sql, names, tuple(lookup_fields[i] for i in lookup_keys)
+
+
+ORM_ACTIONS = frozenset({'view', 'add', 'change', 'delete'})
+
+
+@functools.lru_cache(maxsize=512)
+def _resolve_orm_method(method_name):
+    # 'db__<app_label>.<action>_<model_name>' -> (action, model)
+    # the action gets checked before the model lookup, so malformed names
+    # never reach the app registry
+    try:
+        app_label, _ = method_name.split('__')[1].split('.')
+        action, model_name = _.split('_')
+
+    except (IndexError, ValueError) as e:
+        raise RpcInvalidParamsError from e
+
+    if action not in ORM_ACTIONS:
+        raise RpcInvalidParamsError
+
+    try:
+        model = apps.get_model(f'{app_label}.{model_name}')
+
+    except LookupError as e:
+        raise RpcInvalidParamsError from e
+
+    return action, model
+
 
 class DjangoAuthBackend(AuthBackend):
-    def __init__(self, generic_orm_methods=False):
+    USER_CACHE_MAX_SIZE = 4096
+
+    def __init__(self, generic_orm_methods=False, user_cache_ttl=30):
         self.generic_orm_methods = generic_orm_methods
         self.session_engine = import_module(settings.SESSION_ENGINE)
+        self.user_cache_ttl = user_cache_ttl
+        self._user_cache = {}
+        self._user_cache_lock = threading.Lock()
+
+        # permissions can only be fetched directly if no other backend could
+        # grant any
+        self._model_backend_only = all(
+            type(backend) is ModelBackend for backend in get_backends())
+
+        self._login_method = JsonRpcMethod(self.login)
+        self._anonymous_acl_cache = None
+        self._fake_request_template = HttpRequest()
+
+        # generic ORM methods
+        self._orm_method = JsonRpcMethod(self.handle_orm_call)
+
+        self._orm_actions = {
+            'view': self._model_view,
+            'add': self._model_add,
+            'change': self._model_change,
+            'delete': self._model_delete,
+        }
 
     # Helper methods
+    def _cache_user(self, session_key, user):
+        # the cache gets written from worker threads and the event loop
+        with self._user_cache_lock:
+            # dicts keep insertion order, so the first key is the oldest
+            if len(self._user_cache) >= self.USER_CACHE_MAX_SIZE:
+                self._user_cache.pop(next(iter(self._user_cache)), None)
+
+            self._user_cache[session_key] = (
+                time.monotonic() + self.user_cache_ttl, user)
+
+    def _get_cached_user(self, request):
+        session_key = request.cookies.get('sessionid', '')
+
+        if cached := self._user_cache.get(session_key):
+            if cached[0] > time.monotonic():
+                return cached[1]
+
+            with self._user_cache_lock:
+                self._user_cache.pop(session_key, None)
+
+    def _get_user_threaded(self, request, user=None):
+        # runs in a worker thread; like django does at the start and the end
+        # of every http request, close connections of this thread that are
+        # unusable or older than CONN_MAX_AGE
+        close_old_connections()
+
+        try:
+            if not user:
+                user = self.get_user(request)
+
+            # the permissions are only needed to generate the generic ORM
+            # methods; they get fetched here to keep queries off the loop
+            if self.generic_orm_methods:
+                self._get_perms_cached(user)
+
+            return user
+
+        finally:
+            close_old_connections()
+
+    def _needs_perms_fetch(self, user):
+        # ModelBackend grants no permissions to anonymous users, so they
+        # only need a query if other auth backends are configured
+        return (
+            self.generic_orm_methods and
+            not hasattr(user, '_rpc_perm_cache') and
+            not (user.is_anonymous and self._model_backend_only)
+        )
+
     def get_user(self, request):
         if session_key := request.cookies.get('sessionid', ''):
-            try:
-                session = Session.objects.get(session_key=session_key)
-                uid = session.get_decoded().get('_auth_user_id')
+            if user := self._get_cached_user(request):
+                return user
+
+            # the session store honors the configured SESSION_ENGINE, so
+            # cache backed engines serve this lookup without touching the db;
+            # this is the same lookup django.contrib.auth.get_user() does
+            session = self.session_engine.SessionStore(session_key)
 
+            if uid := session.get(SESSION_KEY):
                 try:
-                    return User.objects.get(pk=uid)
+                    # authorization only needs these columns; other fields,
+                    # for example used by user_passes_test() tests, get
+                    # loaded on first access
+                    user = User.objects.only(
+                        'is_active', 'is_superuser', 'is_staff',
+                    ).get(pk=uid)
+                    self._cache_user(session_key, user)
+
+                    return user
 
                 except User.DoesNotExist:
                     pass
 
-            except Session.DoesNotExist:
-                pass
-
         return AnonymousUser()
 
-    def _is_authorized(self, request, method):
-        def _user_is_authenticated(user):
-            # between django 1.x and 2.x User.is_authenticated was changed
-            # from an method to a boolean
-            # this function adds support for both APIs
+    def _get_perms_cached(self, user):
+        # mirrors ModelBackend.get_all_permissions but fetches user and group
+        # permissions with their content types joined in, and keeps the
+        # result on the user object for the lifetime of the connection;
+        # other auth backends get asked through get_all_permissions()
+        if not hasattr(user, '_rpc_perm_cache'):
+            if not self._model_backend_only:
+                user._rpc_perm_cache = frozenset(user.get_all_permissions())
+
+                return user._rpc_perm_cache
+
+            if not user.is_active or user.is_anonymous:
+                querysets = ()
+
+            elif user.is_superuser:
+                querysets = (Permission.objects.all(), )
+
+            else:
+                querysets = (
+                    user.user_permissions.all(),
+                    Permission.objects.filter(group__user=user),
+                )
+
+            user._rpc_perm_cache = frozenset(
+                f'{permission.content_type.app_label}.{permission.codename}'
+                for queryset in querysets
+                for permission in queryset.select_related('content_type')
+            )
+
+        return user._rpc_perm_cache
 
-            if callable(user.is_authenticated):
-                return user.is_authenticated()
+    def _get_acl(self, rpc, user):
+        # the acl is cached on the user object, so it never outlives the
+        # user state _is_authorized reads: users get resolved on login and
+        # after the user cache expired. Anonymous users have no state, so
+        # all of them share one acl on the backend. _methods_version changes
+        # when methods or topics get added
+        acl_key = (rpc, rpc._methods_version)
 
-            return user.is_authenticated
+        if user.is_anonymous:
+            cached = self._anonymous_acl_cache
+
+        else:
+            cached = getattr(user, '_rpc_acl_cache', None)
+
+        if cached and cached[0] == acl_key:
+            return cached[1], cached[2]
+
+        methods = {}
+
+        # django auth methods
+        if isinstance(user, AnonymousUser):
+            methods['login'] = self._login_method
+
+        # generic django model methods
+        if self.generic_orm_methods:
+            for permission_name in self._get_perms_cached(user):
+                action = permission_name.split('.')[1].split('_')[0]
+                method_name = f'db__{permission_name}'
+
+                if action in ORM_ACTIONS:
+                    methods[method_name] = self._orm_method
+
+        # rpc defined methods
+        for name, method in rpc.methods.items():
+            if self._is_authorized(user, method.method):
+                methods[name] = method
+
+        # topics
+        topics = frozenset(
+            name for name, method in rpc.topics.items()
+            if self._is_authorized(user, method)
+        )
+
+        if user.is_anonymous:
+            self._anonymous_acl_cache = (acl_key, methods, topics)
+
+        else:
+            user._rpc_acl_cache = (acl_key, methods, topics)
+
+        return methods, topics
+
+    def _is_authorized(self, user, method):
+        # set to False by the auth decorators
+        if getattr(method, '_rpc_unrestricted', True):
+            return True
+
+        # anonymous users never pass login or permission checks; only the
+        # user tests are left to run
+        if user.is_anonymous:
+            if(hasattr(method, 'login_required') or
+               hasattr(method, 'permissions_required')):
+                return False
+
+            return all(test(user) for test in getattr(method, 'tests', ()))
 
         if hasattr(method, 'login_required') and (
-           not request.user.is_active or
-           not _user_is_authenticated(request.user)):
+           not user.is_active or not user.is_authenticated):
             return False
 
         # permission check
         if(hasattr(method, 'permissions_required') and
-           not request.user.is_superuser and
-           not request.user.has_perms(method.permissions_required)):
+           not user.is_superuser and
+           not user.has_perms(method.permissions_required)):
             return False
 
         # user tests
-        if hasattr(method, 'tests') and not request.user.is_superuser:
+        if hasattr(method, 'tests') and not user.is_superuser:
             for test in method.tests:
-                if not test(request.user):
+                if not test(user):
                     return False
 
         return True
 
     # generic ORM methods
     def dump_model_object(self, obj):
-        d = model_to_dict(obj)
+        d = {name: getattr(obj, attname)
+             for name, attname in _field_names(type(obj))}
+
         d['pk'] = obj.pk
 
         return d
@@ -80,9 +374,33 @@ class DjangoAuthBackend(AuthBackend):
             raise RpcInvalidParamsError
 
         try:
-            objects = model.objects.filter(**lookups)
+            # exact lookups on simple models run as precompiled raw SQL
+            lookup_keys = tuple(sorted(lookups))
+            using = router.db_for_read(model)
+            raw_select = _get_raw_select(model, lookup_keys, using)
 
-            return [self.dump_model_object(i) for i in objects]
+            if raw_select and None not in lookups.values():
+                sql, names, lookup_fields = raw_select
+                connection = connections[using]
+
+                params = [
+                    field.get_db_prep_value(lookups[key], connection)
+                    for key, field in zip(lookup_keys, lookup_fields)
+                ]
+
+                with connection.cursor() as cursor:
+                    cursor.execute(sql, params)
+
+                    return [dict(zip(names, row)) for row in cursor]
+
+            # fetch plain dicts instead of model instances; values() uses the
+            # same keys as dump_model_object()
+            field_names = [name for name, _ in _field_names(model)]
+
+            objects = model.objects.filter(**lookups).values(
+                *field_names, 'pk')
+
+            return list(objects.iterator(chunk_size=2000))
 
         except Exception as e:
             raise RpcInvalidParamsError from e
@@ -104,6 +422,24 @@ class DjangoAuthBackend(AuthBackend):
     async def _model_add(self, request, model):
         values = request.msg.data['params'] or {}
 
+        # bulk create
+        if isinstance(values, list):
+            if not values or not all(isinstance(i, dict) and i
+                                     for i in values):
+
+                raise RpcInvalidParamsError
+
+            try:
+                new_objects = model.objects.bulk_create(
+                    [model(**i) for i in values],
+                    batch_size=500,
+                )
+
+                return [self.dump_model_object(i) for i in new_objects]
+
+            except Exception as e:
+                raise RpcInvalidParamsError from e
+
         if not isinstance(values, dict) or not values:
             raise RpcInvalidParamsError
 
@@ -116,39 +452,33 @@ class DjangoAuthBackend(AuthBackend):
             raise RpcInvalidParamsError from e
 
     async def _model_change(self, request, model):
+        """
+        Updates the object with the given pk using a single UPDATE query.
+
+        Model.save() is not called, so pre_save and post_save signals are not
+        sent, auto_now fields are not updated and custom Model.save() logic
+        does not run. Returns False if no object with the given pk exists.
+        """
+
         try:
             params = request.msg.data['params']
             pk = params.pop('pk')
 
-            model_object = model.objects.get(pk=pk)
-
-            for field_name, value in params.items():
-                setattr(model_object, field_name, value)
+            # update() without fields does not run a query and returns 0
+            if not params:
+                return model.objects.filter(pk=pk).exists()
 
-            model_object.save()
+            updated = model.objects.filter(pk=pk).update(**params)
 
-            return True
+            return bool(updated)
 
-        except KeyError as e:
+        except (KeyError, FieldDoesNotExist) as e:
             raise RpcInvalidParamsError from e
 
     async def handle_orm_call(self, request):
-        method_name = request.msg.data['method'].split('__')[1]
-        app_label, _ = method_name.split('.')
-        action, model_name = _.split('_')
-        model = apps.get_model(f'{app_label}.{model_name}')
+        action, model = _resolve_orm_method(request.msg.data['method'])
 
-        if action == 'view':
-            return await self._model_view(request, model)
-
-        elif action == 'add':
-            return await self._model_add(request, model)
-
-        elif action == 'change':
-            return await self._model_change(request, model)
-
-        elif action == 'delete':
-            return await self._model_delete(request, model)
+        return await self._orm_actions[action](request, model)
 
     # login / logout
     async def login(self, request):
@@ -164,9 +494,24 @@ class DjangoAuthBackend(AuthBackend):
         if not user:
             return False
 
+        for attr_name in ('_rpc_perm_cache', '_rpc_acl_cache'):
+            if hasattr(user, attr_name):
+                delattr(user, attr_name)
+
+        self._user_cache.pop(request.http_request.cookies.get('sessionid', ''),
+                             None)
+
         # to use the standard django login mechanism, which is build on the
         # request-, response-system, we have to fake a django http request
-        fake_request = HttpRequest()
+        # copy.copy() shares every attribute with the template, and
+        # django_login() rotates the csrf token in request.META, so each
+        # copy gets its own request dicts
+        fake_request = copy.copy(self._fake_request_template)
+        fake_request.GET = QueryDict(mutable=True)
+        fake_request.POST = QueryDict(mutable=True)
+        fake_request.COOKIES = {}
+        fake_request.META = {}
+        fake_request.FILES = MultiValueDict()
         fake_request.session = self.session_engine.SessionStore()
         django_login(fake_request, user)
         fake_request.session.save()
@@ -190,42 +535,37 @@ class DjangoAuthBackend(AuthBackend):
     # request processing
     async def prepare_request(self, request, user=None):
         if not user:
-            user = await request.rpc.loop.run_in_executor(
-                request.rpc.worker_pool.executor,
-                self.get_user,
-                request,
-            )
+            if request.cookies.get('sessionid', ''):
+                user = self._get_cached_user(request)
+
+            else:
+                user = AnonymousUser()
+
+        if not user or self._needs_perms_fetch(user):
+            if sync_to_async:
+                user = await sync_to_async(
+                    self._get_user_threaded,
+                    thread_sensitive=False,
+                )(request, user)
+
+            else:
+                user = await request.rpc.loop.run_in_executor(
+                    request.rpc.worker_pool.executor,
+                    self._get_user_threaded,
+                    request,
+                    user,
+                )
 
         request.user = user
-        request.methods = {}
 
-        # django auth methods
-        if isinstance(request.user, AnonymousUser):
-            request.methods['login'] = JsonRpcMethod(self.login)
+        methods, topics = self._get_acl(request.rpc, user)
 
-        # generic django model methods
-        if self.generic_orm_methods:
-            for permission_name in request.user.get_all_permissions():
-                action = permission_name.split('.')[1].split('_')[0]
-                method_name = f'db__{permission_name}'
+        # the methods dict gets copied because it may be altered per request
+        request.methods = dict(methods)
+        request.topics = topics
 
-                if action in ('view', 'add', 'change', 'delete', ):
-                    request.methods[method_name] = JsonRpcMethod(
-                        self.handle_orm_call)
+        if hasattr(request, 'subscriptions'):
+            request.subscriptions.intersection_update(request.topics)
 
-        # rpc defined methods
-        for name, method in request.rpc.methods.items():
-            if self._is_authorized(request, method.method):
-                request.methods[name] = method
-
-        # topics
-        request.topics = set()
-
-        for name, method in request.rpc.topics.items():
-            if self._is_authorized(request, method):
-                request.topics.add(name)
-
-        if not hasattr(request, 'subscriptions'):
+        else:
             request.subscriptions = set()
-
-        request.subscriptions = request.topics & request.subscriptions
@@ -159,10 +159,11 @@ class PasswdAuthBackend:
             if self._is_authorized(request, method):
                 request.topics.add(name)
 
-        if not hasattr(request, 'subscriptions'):
-            request.subscriptions = set()
+        if hasattr(request, 'subscriptions'):
+            request.subscriptions.intersection_update(request.topics)
 
-        request.subscriptions = request.topics & request.subscriptions
+        else:
+            request.subscriptions = set()
 
     async def login(self, request):
         loop = asyncio.get_event_loop()
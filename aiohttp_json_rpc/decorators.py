@@ -1,10 +1,11 @@
 def raw_response(function=None):
-    def decorator(function):
-        function.raw_response = True
+    # supports both @raw_response and @raw_response()
+    if function is None:
+        return raw_response
 
-        return function
+    function.raw_response = True
 
-    return decorator(function) if function else decorator
+    return function
 
 
 def validate(**kwargs):
@@ -12,7 +13,12 @@ def validate(**kwargs):
         if not hasattr(function, 'validators'):
             function.validators = {}
 
-        function.validators.update(kwargs)
+        # validators get normalized to tuples once, at decoration time
+        for arg_name, validators in kwargs.items():
+            if not isinstance(validators, (list, tuple)):
+                validators = (validators, )
+
+            function.validators[arg_name] = tuple(validators)
 
         return function
 
@@ -64,6 +64,17 @@ class JsonRpcMethod:
             if i not in self.CREDENTIAL_KEYS + ['self']
         ]
 
+        # validators
+        self.validators = []
+
+        for arg_name, validator_list in getattr(
+                method, 'validators', {}).items():
+
+            if not isinstance(validator_list, (list, tuple)):
+                validator_list = [validator_list]
+
+            self.validators.append((arg_name, tuple(validator_list)))
+
         # gen repr string
         args = []
 
@@ -111,21 +122,17 @@ class JsonRpcMethod:
             method_params[v] = params.get(v, self.defaults[i])
 
         # validators
-        if hasattr(self.method, 'validators'):
-            for arg_name, validator_list in self.method.validators.items():
-                if not isinstance(validator_list, (list, tuple)):
-                    validator_list = [validator_list]
-
-                for validator in validator_list:
-                    if isinstance(validator, type):
-                        if not isinstance(method_params[arg_name], validator):
-                            raise RpcInvalidParamsError(
-                                message=f"'{arg_name}' has to be '{validator.__name__}'"
-                            )
-
-                    elif isinstance(validator, types.FunctionType):
-                        if not validator(method_params[arg_name]):
-                            raise RpcInvalidParamsError(message=f"'{arg_name}': validation error")
+        for arg_name, validator_list in self.validators:
+            for validator in validator_list:
+                if isinstance(validator, type):
+                    if not isinstance(method_params[arg_name], validator):
+                        raise RpcInvalidParamsError(
+                            message=f"'{arg_name}' has to be '{validator.__name__}'"
+                        )
+
+                elif isinstance(validator, types.FunctionType):
+                    if not validator(method_params[arg_name]):
+                        raise RpcInvalidParamsError(message=f"'{arg_name}': validation error")
 
         # credentials
         if 'request' in self.argspec.args:
@@ -156,6 +163,7 @@ class JsonRpc(object):
         self.methods = {}
         self.topics = {}
         self.state = {}
+        self._methods_version = 0
         self.logger = logger or logging.getLogger('aiohttp-json-rpc.server')
         self.auth_backend = auth_backend or DummyAuthBackend()
         self.loop = loop or asyncio.get_event_loop()
@@ -179,6 +187,7 @@ class JsonRpc(object):
             name = f'{prefix}__{name}'
 
         self.methods[name] = JsonRpcMethod(method)
+        self._methods_version += 1
 
     def _add_methods_from_object(self, obj, prefix='', ignore=None):
         if ignore is None:
@@ -242,6 +251,7 @@ class JsonRpc(object):
                     func = decorator(func)
 
             self.topics[name] = func
+            self._methods_version += 1
 
     def __call__(self, request):
         return self.handle_request(request)
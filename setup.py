@@ -10,7 +10,7 @@ __name__ == '__main__' and setup(name='aiohttp-json-rpc',
       url='https://github.com/pengutronix/aiohttp-json-rpc/',
       author_email='f.scherf@pengutronix.de',
       license='Apache 2.0',
-      install_requires=['aiohttp>=3,<4'],
+      install_requires=['aiohttp>=3,<4', 'orjson'],
       python_requires='>=3.5',
       packages=find_packages(),
       zip_safe=False,
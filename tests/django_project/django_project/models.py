@@ -7,3 +7,12 @@ class Item(models.Model):
 
     def __str__(self):
         return 'client_id: {}, number: {}'.format(self.client_id, self.number)
+
+
+class UpperCaseTextField(models.TextField):
+    def from_db_value(self, value, expression, connection):
+        return value if value is None else value.upper()
+
+
+class Note(models.Model):
+    text = UpperCaseTextField()
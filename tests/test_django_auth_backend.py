@@ -3,6 +3,14 @@ import pytest
 pytestmark = pytest.mark.django(reason='Depends on Django')
 
 
+class ExtraPermissionBackend:
+    def authenticate(self, request, **credentials):
+        return None
+
+    def get_all_permissions(self, user_obj, obj=None):
+        return {'django_project.view_item'}
+
+
 @pytest.fixture
 def items(db):
     from django_project.models import Item
@@ -44,6 +52,169 @@ async def test_login(django_rpc_context, django_staff_user):
     assert 'restricted_method' in methods
 
 
+@pytest.mark.asyncio
+async def test_revoked_user_test(django_rpc_context):
+    from django.contrib.auth import get_user_model
+
+    from aiohttp_json_rpc.auth import user_passes_test
+
+    @user_passes_test(lambda user: user.is_staff)
+    async def staff_method(request):
+        return True
+
+    django_rpc_context.rpc.add_methods(('', staff_method))
+
+    user = get_user_model().objects.create(username='staff', is_active=True,
+                                           is_staff=True)
+
+    user.set_password('staff')
+    user.save()
+
+    async def get_methods():
+        client = await django_rpc_context.make_client()
+
+        assert await client.call('login', {
+            'username': 'staff',
+            'password': 'staff',
+        })
+
+        return await client.call('get_methods')
+
+    assert 'staff_method' in await get_methods()
+
+    user.is_staff = False
+    user.save()
+
+    assert 'staff_method' not in await get_methods()
+
+
+@pytest.mark.asyncio
+async def test_revoked_topic_user_test(django_rpc_context):
+    from django.contrib.auth import get_user_model
+
+    from aiohttp_json_rpc.auth import user_passes_test
+
+    django_rpc_context.rpc.add_topics(
+        ('staff_topic', user_passes_test(lambda user: user.is_staff)),
+    )
+
+    user = get_user_model().objects.create(username='staff', is_active=True,
+                                           is_staff=True)
+
+    user.set_password('staff')
+    user.save()
+
+    async def get_topics():
+        client = await django_rpc_context.make_client()
+
+        assert await client.call('login', {
+            'username': 'staff',
+            'password': 'staff',
+        })
+
+        return await client.call('get_topics')
+
+    assert 'staff_topic' in await get_topics()
+
+    user.is_staff = False
+    user.save()
+
+    assert 'staff_topic' not in await get_topics()
+
+
+@pytest.mark.asyncio
+async def test_anonymous_user(django_rpc_context):
+    from aiohttp_json_rpc.auth import (
+        permission_required,
+        user_passes_test,
+        login_required,
+    )
+
+    @login_required
+    async def login_method(request):
+        return True
+
+    @permission_required('django_project.view_item')
+    async def permission_method(request):
+        return True
+
+    @user_passes_test(lambda user: user.is_anonymous)
+    async def anonymous_method(request):
+        return True
+
+    @user_passes_test(lambda user: user.is_staff)
+    async def staff_method(request):
+        return True
+
+    django_rpc_context.rpc.add_methods(
+        ('', login_method),
+        ('', permission_method),
+        ('', anonymous_method),
+        ('', staff_method),
+    )
+
+    client = await django_rpc_context.make_client()
+    methods = await client.call('get_methods')
+
+    assert 'anonymous_method' in methods
+    assert 'login_method' not in methods
+    assert 'permission_method' not in methods
+    assert 'staff_method' not in methods
+
+
+@pytest.mark.asyncio
+async def test_anonymous_user_stays_on_loop(django_rpc_context):
+    def _get_user_threaded(*args, **kwargs):
+        raise AssertionError('anonymous users need no worker thread')
+
+    django_rpc_context.rpc.auth_backend._get_user_threaded = (
+        _get_user_threaded)
+
+    client = await django_rpc_context.make_client()
+
+    assert 'login' in await client.call('get_methods')
+
+
+@pytest.mark.asyncio
+async def test_methods_added_after_connect(django_rpc_context):
+    async def ping(request):
+        return 'pong'
+
+    client = await django_rpc_context.make_client()
+
+    assert 'ping' not in await client.call('get_methods')
+
+    django_rpc_context.rpc.add_methods(('', ping))
+    client = await django_rpc_context.make_client()
+
+    assert 'ping' in await client.call('get_methods')
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.asyncio
+async def test_session_cookie(django_rpc_context, django_staff_user):
+    from importlib import import_module
+
+    from django.conf import settings
+
+    session = import_module(settings.SESSION_ENGINE).SessionStore()
+    session['_auth_user_id'] = str(django_staff_user.pk)
+    session.save()
+
+    client = await django_rpc_context.make_client(
+        cookies={'sessionid': session.session_key})
+
+    methods = await client.call('get_methods')
+
+    assert 'login' not in methods
+
+    # second connection is served from the user cache
+    client = await django_rpc_context.make_client(
+        cookies={'sessionid': session.session_key})
+
+    assert 'login' not in await client.call('get_methods')
+
+
 @pytest.mark.asyncio
 async def test_generic_orm_methods(django_rpc_context, django_staff_user):
     client = await django_rpc_context.make_client()
@@ -58,6 +229,54 @@ async def test_generic_orm_methods(django_rpc_context, django_staff_user):
     assert list(filter(lambda m: m.startswith('db__'), methods))
 
 
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.asyncio
+async def test_generic_orm_methods_permissions(django_rpc_context):
+    from django.contrib.auth.models import Group, Permission
+    from django.contrib.auth import get_user_model
+
+    user = get_user_model().objects.create(username='user', is_active=True)
+    user.set_password('user')
+    user.save()
+
+    user.user_permissions.add(Permission.objects.get(
+        content_type__app_label='django_project', codename='view_item'))
+
+    group = Group.objects.create(name='group')
+    group.permissions.add(Permission.objects.get(
+        content_type__app_label='django_project', codename='add_item'))
+    user.groups.add(group)
+
+    client = await django_rpc_context.make_client()
+
+    assert await client.call('login', {
+        'username': 'user',
+        'password': 'user',
+    })
+
+    methods = await client.call('get_methods')
+
+    assert 'db__django_project.view_item' in methods
+    assert 'db__django_project.add_item' in methods
+    assert 'db__django_project.delete_item' not in methods
+
+
+def test_generic_orm_methods_other_backends(db, settings):
+    from django.contrib.auth import get_user_model
+
+    from aiohttp_json_rpc.auth.django import DjangoAuthBackend
+
+    settings.AUTHENTICATION_BACKENDS = [
+        'django.contrib.auth.backends.ModelBackend',
+        'test_django_auth_backend.ExtraPermissionBackend',
+    ]
+
+    user = get_user_model().objects.create(username='user', is_active=True)
+    backend = DjangoAuthBackend(generic_orm_methods=True)
+
+    assert backend._get_perms_cached(user) == {'django_project.view_item'}
+
+
 @pytest.mark.asyncio
 async def test_generic_orm_view(django_rpc_context, django_staff_user, items):
     client = await django_rpc_context.make_client()
@@ -75,6 +294,67 @@ async def test_generic_orm_view(django_rpc_context, django_staff_user, items):
     })
 
     assert len(items) == 8
+    assert set(items[0]) == {'id', 'pk', 'client_id', 'number'}
+
+
+@pytest.mark.asyncio
+async def test_generic_orm_view_exact_lookups(django_rpc_context,
+                                              django_staff_user, items):
+
+    from django_project.models import Item
+
+    client = await django_rpc_context.make_client()
+
+    assert await client.call('login', {
+        'username': 'admin',
+        'password': 'admin',
+    })
+
+    item = Item.objects.get(number=3)
+
+    assert await client.call('db__django_project.view_item', {
+        'number': 3,
+        'client_id': '3',
+    }) == [{
+        'id': item.pk,
+        'pk': item.pk,
+        'client_id': 3,
+        'number': 3,
+    }]
+
+    assert await client.call('db__django_project.view_item', {
+        'pk': item.pk,
+        'number': 4,
+    }) == []
+
+
+@pytest.mark.asyncio
+async def test_generic_orm_view_converted_fields(django_rpc_context,
+                                                 django_staff_user):
+
+    from django_project.models import Note
+
+    from aiohttp_json_rpc.auth.django import _get_raw_select
+
+    note = Note.objects.create(text='note')
+
+    # from_db_value() has to run, so the ORM has to be used
+    assert _get_raw_select(Note, ('text', ), 'default') is None
+
+    client = await django_rpc_context.make_client()
+
+    assert await client.call('login', {
+        'username': 'admin',
+        'password': 'admin',
+    })
+
+    assert await client.call('db__django_project.view_note', {
+        'text': 'note',
+    }) == [{
+        'id': note.pk,
+        'pk': note.pk,
+        'text': 'NOTE',
+    }]
 
 
 @pytest.mark.asyncio
@@ -121,6 +401,30 @@ async def test_generic_orm_add(django_rpc_context, django_staff_user, items):
     })
 
 
+@pytest.mark.asyncio
+async def test_generic_orm_bulk_add(django_rpc_context, django_staff_user,
+                                    items):
+
+    from aiohttp_json_rpc import RpcInvalidParamsError
+
+    client = await django_rpc_context.make_client()
+
+    assert await client.call('login', {
+        'username': 'admin',
+        'password': 'admin',
+    })
+
+    new_items = await client.call('db__django_project.add_item', [
+        {'client_id': 100, 'number': i} for i in range(1000)
+    ])
+
+    assert len(new_items) == 1000
+    assert len(await client.call('db__django_project.view_item')) == 1010
+
+    with pytest.raises(RpcInvalidParamsError):
+        await client.call('db__django_project.add_item', [1, 2, 3])
+
+
 @pytest.mark.asyncio
 async def test_generic_orm_change(django_rpc_context, django_staff_user,
                                   items):
@@ -144,3 +448,12 @@ async def test_generic_orm_change(django_rpc_context, django_staff_user,
     }))[0]
 
     assert change_item['number'] == item['number'] + 1
+
+    assert not await client.call('db__django_project.change_item', {
+        'pk': -1,
+        'number': 0,
+    })
+
+    assert await client.call('db__django_project.change_item', {
+        'pk': item['pk'],
+    })
@@ -146,6 +146,27 @@ async def test_type_validators(rpc_context):
         await client.call('method', '1')
 
 
+@pytest.mark.asyncio
+async def test_validators_attribute(rpc_context):
+    from aiohttp_json_rpc import RpcInvalidParamsError
+
+    async def method(a):
+        assert type(a) == int
+
+    method.validators = {'a': int}
+
+    rpc_context.rpc.add_methods(
+        ('', method),
+    )
+
+    client = await rpc_context.make_client()
+
+    await client.call('method', 1)
+
+    with pytest.raises(RpcInvalidParamsError):
+        await client.call('method', '1')
+
+
 @pytest.mark.asyncio
 async def test_function_validators(rpc_context):
     from aiohttp_json_rpc import RpcInvalidParamsError, validate